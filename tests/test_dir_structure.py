@@ -1,12 +1,65 @@
 # -*- coding: utf-8 -*-
 
+import functools
+import pathlib
 import unittest
 
+from thesis_api.dir_structure import Chapter, _format_columns, format_table
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    pd = None
+
 
 class TestChapter(unittest.TestCase):
     def setUp(self) -> None:
         pass
 
+    def test_filename_without_format(self):
+        with self.assertRaises(ValueError):
+            Chapter(
+                "plot", pathlib.Path("./tests/data"), "chapter1", "figs", True
+            )
+
+    @unittest.skipIf(pd is None, "pandas is not installed")
+    def test_format_columns(self):
+        data = pd.DataFrame(
+            {
+                "a": [1.5, np.nan, 1e-7],
+                "b": [3, 4, -5],
+                "n": ["x", "y", "z"],
+                "f": [True, False, True],
+                "z": [0.1, 0.2, 0.3],
+                0: [1.0, 2.0, 3.0],
+            }
+        )
+        format_cols = {
+            "a": "m",
+            "b": ("s", {"round-mode": "places"}),
+            "f": ("", {"k": "v"}),
+            0: "kg",
+            "unknown": "m",
+        }
+        data_desc = {"caption": "cap", "label": "tab:x"}
+        # the formatters of pandas are the previous way of formatting
+        formatters = {
+            key: functools.partial(format_table, unit=value[0], kwds=value[1])
+            if isinstance(value, tuple)
+            else functools.partial(format_table, unit=value)
+            for key, value in format_cols.items()
+        }
+        expected = data.to_latex(
+            formatters=formatters, escape=False, index=False, **data_desc
+        )
+        data_, data_desc_ = _format_columns(data, data_desc, format_cols)
+        assert (
+            data_.to_latex(escape=False, index=False, **data_desc_) == expected
+        )
+        # the arguments are not modified
+        assert data["a"].dtype == float and "column_format" not in data_desc
+
     def test_savefig_matplotlib(self):
         pass
 
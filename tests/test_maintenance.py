@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 
 import json
+import os
 import pathlib
 import shutil
+import tempfile
 import unittest
 
 from thesis_api import LATEX_CONFIG_DIC
@@ -49,6 +51,82 @@ class TestMaintainer(unittest.TestCase):
     def test_cleanup(self):
         self.maint.cleanup(self.thesis_dir, delete=False)
 
+    def test_check_main_orphans(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = pathlib.Path(tmp)
+            maint = Maintainer(root, stream=True)
+            for name in ("chapter1", "chapter2"):
+                (chapter := root / "chapters" / name).mkdir(parents=True)
+                (chapter / f"{name}.tex").write_text("")
+            # LaTeX appends the omitted file ending
+            main = "\\input{chapters/chapter1/chapter1}"
+            (root / "main.tex").write_text(main)
+            with self.assertLogs("Maintainer", level="WARNING") as logs:
+                maint.check_main()
+            assert len(logs.output) == 1, logs.output
+            assert "chapter2.tex is not included" in logs.output[0]
+
+    def test_init_chapter_invalid(self):
+        chapter = {**self.data["chapter"], "chapter": 99}
+        sections = self.data["sections"][:-1]
+        with self.assertRaises(ValueError):
+            self.maint.init_chapter_dir(
+                chapter, sections, self.data["subsections"]
+            )
+        # the description is validated before anything is created
+        assert not (self.chapter_dir / "chapter99").exists()
+
+    def test_cleanup_new_empty_dir(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = pathlib.Path(tmp)
+            (root / "a").mkdir()
+            (root / "a" / "file.tex").write_text("keep")
+            self.maint.cleanup(root, delete=True)
+            # the cached listing of a changed directory is renewed
+            (empty := root / "a" / "empty").mkdir()
+            self.maint.cleanup(root, delete=True)
+            assert not empty.exists(), f"{empty} was not deleted!"
+
+    def test_check_inputs_created_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = pathlib.Path(tmp)
+            maint = Maintainer(root, stream=True)
+            (root / "a.tex").write_text("\\input{b.tex}")
+            maint.check_inputs(root)
+            assert maint.counter == 1
+            # a file created after a check is found by the next check
+            (root / "b.tex").write_text("")
+            maint.check_inputs(root)
+            assert maint.counter == 1
+
+    def test_missing_root(self):
+        missing = self.thesis_dir / "does_not_exist"
+        with self.assertRaises(FileNotFoundError):
+            self.maint.check_inputs(missing)
+        with self.assertRaises(FileNotFoundError):
+            self.maint.cleanup(missing)
+
+    def test_cleanup_stale_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = pathlib.Path(tmp)
+            (empty := root / "empty").mkdir()
+            self.maint.cleanup(root, delete=False)
+            # add a file without changing the modification time
+            stat = os.stat(empty)
+            (precious := empty / "precious.tex").write_text("keep")
+            os.utime(empty, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            self.maint.cleanup(root, delete=True)
+            assert precious.exists(), f"{precious} was deleted!"
+
+    def test_cleanup_delete(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = pathlib.Path(tmp)
+            (empty := root / "a" / "empty").mkdir(parents=True)
+            (root / "a" / "file.tex").write_text("keep")
+            self.maint.cleanup(root, delete=True)
+            assert not empty.exists(), f"{empty} was not deleted!"
+            assert (root / "a").exists(), f"{root / 'a'} was deleted!"
+
     def test_create_ftc(self):
         typ = (
             {"figs": True, "tabs": True, "code": True},
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+import pathlib
+import string
+import unittest
+
+from thesis_api.tools.template_strings import (
+    ChapterTemplate,
+    CodeTemplate,
+    FigureTemplate,
+    InputTemplate,
+    SectionTemplate,
+    SiUnitxTemplate,
+    SubsectionTemplate,
+    TableTemplate,
+    _FormatTemplate,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class _Formatted(object):
+    """A value whose ``format`` differs from its ``str``."""
+
+    def __str__(self) -> str:
+        return "str"
+
+    def __format__(self, format_spec: str) -> str:
+        return "format"
+
+
+class TestTemplates(unittest.TestCase):
+    def setUp(self) -> None:
+        self.values = {
+            "title": "chapter1",
+            "label": "chapter1",
+            "path": "source/chapters/chapter1/figs/fig.pdf",
+            "position": "htb",
+            "width": 0.8,
+            "caption": "A caption with {braces} and $math$",
+            "short_caption": "short",
+            "long_caption": "long",
+            "language": "python",
+            "arraystretch": 1.8,
+            "data": "\\begin{tabular}{lr}\n\\end{tabular}",
+            "num": 1.5,
+            "unit": "\\metre",
+        }
+        self.templates = (
+            ChapterTemplate(),
+            SectionTemplate(),
+            SubsectionTemplate(),
+            InputTemplate(),
+            FigureTemplate(),
+            CodeTemplate(),
+            TableTemplate(),
+            SiUnitxTemplate(None),
+            SiUnitxTemplate("\\metre"),
+            SiUnitxTemplate("\\metre", {"round-precision": 3}),
+        )
+
+    def test_substitute(self):
+        for t in self.templates:
+            expected = string.Template(t.template).substitute(self.values)
+            assert t.substitute(self.values) == expected, t.template
+            assert t.substitute(**self.values) == expected, t.template
+
+    def test_value_types(self):
+        # string.Template inserts str(value), not format(value, "")
+        values = [_Formatted()]
+        if np is not None:
+            values += [np.float32(0.1), np.float16(0.1)]
+        for value in values:
+            mapping = dict.fromkeys(self.values, value)
+            for t in self.templates:
+                expected = string.Template(t.template).substitute(mapping)
+                assert t.substitute(mapping) == expected, (t.template, value)
+
+    def test_safe_substitute(self):
+        values = {"label": "x", "num": 2}
+        for t in self.templates:
+            expected = string.Template(t.template).safe_substitute(values)
+            assert t.safe_substitute(values) == expected, t.template
+
+    def test_short_caption(self):
+        for t in (FigureTemplate(True), CodeTemplate(True)):
+            values = {**self.values, "caption": ("long", "short")}
+            expected = string.Template(t.template).substitute(self.values)
+            assert t.substitute(values) == expected, t.template
+            assert values["caption"] == ("long", "short")
+
+    def test_paths(self):
+        path = pathlib.PurePosixPath("/home/u/source/proj/source/algo.py")
+        # only the input template shortens the path
+        t = InputTemplate()
+        expected = "\n\\input{source/proj/source/algo.py}\n"
+        assert t.substitute(path=path) == expected
+        assert t.substitute(path="a\\b.tex") == "\n\\input{a/b.tex}\n"
+        for t in (FigureTemplate(), CodeTemplate(True)):
+            values = {**self.values, "path": path, "caption": ("l", "s")}
+            assert f"{{{path}}}" in t.substitute(values), t.template
+
+    def test_braced_placeholder(self):
+        for tmpl in ("a ${x}b $y", "$$ ${x} {$y}"):
+            t = _FormatTemplate(tmpl)
+            expected = string.Template(tmpl)
+            assert t.substitute(x=0, y=1) == expected.substitute(x=0, y=1)
+            assert t.safe_substitute(y=1) == expected.safe_substitute(y=1)
+
+    def test_invalid_placeholder(self):
+        # the invalid placeholder is only reported when substituting
+        t = SiUnitxTemplate("m", {"k": "$"})
+        expected = string.Template(t.template).safe_substitute(num=1)
+        assert t.safe_substitute(num=1) == expected
+        with self.assertRaises(ValueError):
+            t.substitute(num=1, unit="m")
+
+
+if __name__ == "__main__":
+    unittest.main()
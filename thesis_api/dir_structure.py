@@ -3,25 +3,60 @@
 __doc__ = """
 """
 
-import functools
 import pathlib
 import re
 import string
-from typing import Any, Callable, Optional, Union
+from typing import Any, Optional, Union
 
 from . import LATEX_CONFIG_DIC, get_logger
 from .tools.template_strings import (
+    INPUT_TEMPLATE,
     FigureTemplate,
-    InputTemplate,
     SiUnitxTemplate,
     TableTemplate,
 )
 
+_ENCODING: str = LATEX_CONFIG_DIC["encoding"]
+
+# the templates are stateless, so they are shared between all calls
+_FIG_TEMPLATE_SHORT = FigureTemplate(short_caption=True)
+_FIG_TEMPLATE_NOSHORT = FigureTemplate(short_caption=False)
+_TAB_TEMPLATE = TableTemplate()
+
+# the kaleido scope starts a chromium subprocess, so it is created only once
+# False marks that kaleido is not installed
+_plotly_scope: Any = None
+
+
+def _get_plotly_scope() -> Any:
+    """Get the shared kaleido ``PlotlyScope``.
+
+    The scope is created on the first call and reused afterwards.
+
+    Returns
+    -------
+    Optional[kaleido.scopes.plotly.PlotlyScope]
+        The scope, or None if kaleido is not installed.
+
+    """
+    global _plotly_scope
+    if _plotly_scope is None:
+        try:
+            from kaleido.scopes.plotly import PlotlyScope  # type: ignore
+        except ModuleNotFoundError:
+            _plotly_scope = False
+        else:
+            _plotly_scope = PlotlyScope(
+                plotlyjs="https://cdn.plot.ly/plotly-latest.min.js",
+                # plotlyjs="/path/to/local/plotly.js",
+            )
+    return _plotly_scope or None
+
 
 def format_table(
     number: Union[int, float],
     unit: Optional[str] = None,
-    kwds: dict[str, str] = {},
+    kwds: Optional[dict[str, str]] = None,
 ) -> str:
     r"""Format numbers in tables.
 
@@ -35,9 +70,9 @@ def format_table(
         The number from the DataFrame.
     unit : Optional[str], optional
         The corresponding unit, by default None.
-    kwds : dict[str, str]
+    kwds : Optional[dict[str, str]], optional
         A dictionary which gives additional information to the macros of
-        siunitx.
+        siunitx, by default None.
 
     Returns
     -------
@@ -59,6 +94,94 @@ def format_table(
     return temp_str
 
 
+def format_column(
+    values: Any,
+    unit: Optional[str] = None,
+    kwds: Optional[dict[str, str]] = None,
+) -> Any:
+    r"""Format a whole column of numbers in tables.
+
+    This is the vectorized version of ``format_table``: the siunitx macro
+    is built once and wrapped around the string representations of all
+    numbers with a single string concatenation of the column.
+
+    Parameters
+    ----------
+    values : pandas.Series
+        The column of the DataFrame.
+    unit : Optional[str], optional
+        The corresponding unit, by default None.
+    kwds : Optional[dict[str, str]], optional
+        A dictionary which gives additional information to the macros of
+        siunitx, by default None.
+
+    Returns
+    -------
+    pandas.Series
+        The column with LaTeX siunitx strings.
+
+    """
+    template = SiUnitxTemplate(unit, kwds)
+    if unit:
+        macro: str = template.safe_substitute(unit=unit)
+    else:
+        macro: str = template.template
+    # the macros contain the number exactly once, missing values are kept
+    # like pandas does not pass them to formatters
+    head, _, tail = macro.partition("$num")
+    return head + values.map(str, na_action="ignore") + tail
+
+
+def _format_columns(
+    data: Any,
+    data_desc: dict[str, Union[str, tuple]],
+    format_cols: dict[
+        str, Union[tuple[str, dict[str, Union[str, int, float]]], str]
+    ],
+) -> tuple[Any, dict[str, Union[str, tuple]]]:
+    """Format the columns of a table with ``format_column``.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        The data of the table, which is not modified.
+    data_desc : dict[str, Union[str, tuple]]
+        The arguments of ``DataFrame.to_latex``, which are not modified.
+    format_cols : dict[str, Union[tuple[str, dict[str, Union[str, int, float]]], str]]
+        A dictionary which maps columns to the unit and the siunitx
+        arguments, keys which are no columns of ``data`` are ignored.
+
+    Returns
+    -------
+    tuple[pandas.DataFrame, dict[str, Union[str, tuple]]]
+        The formatted copy of ``data`` and the arguments of
+        ``DataFrame.to_latex``.
+
+    """
+    if "column_format" not in data_desc:
+        # the formatted columns become strings, so the default
+        # alignment of pandas is taken from the original columns
+        numeric = set(data.select_dtypes(include=["number", "bool"]))
+        data_desc = {
+            **data_desc,
+            "column_format": "".join(
+                "r" if col in numeric else "l"
+                for col in data_desc.get("columns", data.columns)
+            ),
+        }
+    data = data.copy()
+    columns = set(data.columns)
+    # format whole columns instead of calling a formatter per cell
+    for key, value in format_cols.items():
+        if key not in columns:
+            continue
+        if isinstance(value, tuple):
+            data[key] = format_column(data[key], *value)
+        else:
+            data[key] = format_column(data[key], value)
+    return data, data_desc
+
+
 class Chapter(object):
     def __init__(
         self,
@@ -96,6 +219,11 @@ class Chapter(object):
             Determine whether to log to console or to a file,
             by default False.
 
+        Raises
+        ------
+        ValueError
+            If ``filename`` has no file format.
+
         """
         # save the thesis directory
         self._thesis_dir: pathlib.Path = thesis_dir
@@ -103,18 +231,31 @@ class Chapter(object):
         self._figures_dir = self._thesis_dir / "figures"
         self._source_dir = self._thesis_dir / "source"
         self._chapter_dir: pathlib.Path = self._source_dir / "chapters"
+        self._chapter_dir_resolved: pathlib.Path = self._chapter_dir.resolve()
         # save the location where it should be saved
         self._location: list[str] = location.lower().replace(" ", "").split(
             "\n"
         )
-        # get the filename and the file format
-        self._filename, self._fmt = filename.split(".")
-        self._fmt = self._fmt.lower()
-        # get the corresponding folder
-        self._folder: str = typ.lower()
         # define the logger
         self._stream = stream
         self._logger = get_logger(type(self).__name__, stream=stream)
+        # get the filename and the file format
+        self._filename, sep, fmt = filename.rpartition(".")
+        if not sep:
+            msg: str = f"The filename {filename} has no file format!"
+            if not self._stream:
+                self._logger.critical(msg)
+            raise ValueError(msg)
+        self._fmt: str = fmt.lower()
+        self._filename_tex: str = f"{self._filename}.tex"
+        # get the corresponding folder
+        self._folder: str = typ.lower()
+        # the target directories only depend on the arguments above
+        self._goal_dir: pathlib.Path = self._construct_path()
+        self._child_folder: pathlib.Path = self._goal_dir / self._folder
+        self._child_rel: str = self._child_folder.relative_to(
+            self._thesis_dir
+        ).as_posix()
 
     def __str__(self) -> str:
         """String representation of ``self``.
@@ -125,14 +266,12 @@ class Chapter(object):
             The class as string.
 
         """
-        msg: str = f"|-{self._chapter_dir.resolve()}\n"
+        parts: list[str] = [f"|-{self._chapter_dir_resolved}\n"]
         for i, loc in enumerate(self._location, start=1):
-            msg += "|" + i * "--" + f">{loc}\n"
-        i += 1
-        msg += "|" + i * "--" + f">{self._folder}\n"
-        i += 1
-        msg += "|" + i * "--" + f">{self._filename}\n"
-        return msg
+            parts.append(f"|{i * '--'}>{loc}\n")
+        parts.append(f"|{(i + 1) * '--'}>{self._folder}\n")
+        parts.append(f"|{(i + 2) * '--'}>{self._filename}\n")
+        return "".join(parts)
 
     def _construct_path(self) -> pathlib.Path:
         """Construct the path in which the file should be saved.
@@ -173,8 +312,10 @@ class Chapter(object):
             The fields to write to the template.
 
         """
-        template = template_str.substitute(template_desc)
-        path.write_text(template, encoding=LATEX_CONFIG_DIC["encoding"])
+        data = template_str.substitute(template_desc).encode(_ENCODING)
+        # the buffered writer writes all bytes or raises
+        with open(path, "wb") as file:
+            file.write(data)
 
     def save_fig(
         self,
@@ -231,17 +372,17 @@ class Chapter(object):
         [3] https://plotly.github.io/plotly.py-docs/generated/plotly.graph_objects.Figure.html#write_image
 
         """
-        # construct the corresponding path
-        goal_dir: pathlib.Path = self._construct_path()
         # get the folder and filename for the child directory
-        child_folder = goal_dir / self._folder
+        goal_dir = self._goal_dir
+        child_folder = self._child_folder
         if not child_folder.exists():
             child_folder.mkdir(parents=True, exist_ok=True)
         filename: str = f"{self._filename}_{'_'.join(self._location)}.{self._fmt}"
         child_filename = self._figures_dir / filename
-        child_filename_tex = child_folder / f"{self._filename}.tex"
-        # fig_desc["path"] = child_filename
-        fig_desc["path"] = child_filename.parts[-2:]  # type: ignore
+        child_filename_tex = child_folder / self._filename_tex
+        fig_desc["path"] = child_filename.relative_to(
+            self._thesis_dir
+        ).as_posix()
         t = type(fig)
         # check if t is of type matplotlib figure
         if t.__module__ == (mm := "matplotlib.figure"):
@@ -258,16 +399,11 @@ class Chapter(object):
                         msg: str = f"The poppler library needs to be installed when saving to eps format using plotly!"
                         self._logger.critical(msg)
                     raise ModuleNotFoundError from e
-            try:
-                from kaleido.scopes.plotly import PlotlyScope  # type: ignore
-
-                scope = PlotlyScope(
-                    plotlyjs="https://cdn.plot.ly/plotly-latest.min.js",
-                    # plotlyjs="/path/to/local/plotly.js",
-                )
+            scope = _get_plotly_scope()
+            if scope is not None:
                 with child_filename.open(mode="wb") as file:
                     file.write(scope.transform(fig, format=self._fmt))
-            except ModuleNotFoundError:
+            else:
                 self._logger.warning(
                     f"Kaleido is not installed, falling back to plotly save."
                 )
@@ -279,15 +415,17 @@ class Chapter(object):
             raise TypeError(msg)
         # fill the tex template
         if isinstance(fig_desc["caption"], tuple):
-            short = True
+            template = _FIG_TEMPLATE_SHORT
         else:
-            short = False
-        self._fill_template(
-            child_filename_tex, FigureTemplate(short_caption=short), fig_desc
-        )
+            template = _FIG_TEMPLATE_NOSHORT
+        self._fill_template(child_filename_tex, template, fig_desc)
         # get the tex filename for the parent
         parent_filename_tex = list(goal_dir.glob("*.tex"))[0]
-        self.update(parent_filename_tex, child_filename_tex)
+        self.update(
+            parent_filename_tex,
+            child_filename_tex,
+            child_rel=f"{self._child_rel}/{self._filename_tex}",
+        )
 
     def save_tab(
         self,
@@ -321,9 +459,9 @@ class Chapter(object):
                 to be placed after ``\begin{}`` in the output.
 
         format_cols : Optional[dict[str, Union[tuple[str, dict[str, Union[str, int, float]]], str]]], optional
-            A dictionary which maps columns to the
-            ``format_table`` function which formats floats for LaTeX,
-            by default None.
+            A dictionary which maps columns to the unit and the siunitx
+            arguments used by ``format_column``, which formats floats
+            for LaTeX, by default None.
         latex_args : dict[str, Union[float, str, bool, list[str]]], optional
             A dict of arguments specific for LaTeX, by default {}.
             The arguments can be:
@@ -355,29 +493,17 @@ class Chapter(object):
         [1] https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.to_latex.html
 
         """
-        # construct the corresponding path
-        goal_dir: pathlib.Path = self._construct_path()
         # get the folder and filename for the child directory
-        child_folder = goal_dir / self._folder
+        goal_dir = self._goal_dir
+        child_folder = self._child_folder
         if not child_folder.exists():
             child_folder.mkdir(parents=True, exist_ok=True)
         child_filename = child_folder / f"{self._filename}.{self._fmt}"
         if format_cols:
-            formatters: dict[str, Callable] = {}
-            for key, value in format_cols.items():
-                if isinstance(value, tuple):
-                    formatters[key] = functools.partial(
-                        format_table, unit=value[0], kwds=value[1]
-                    )
-                else:
-                    formatters[key] = functools.partial(
-                        format_table, unit=value
-                    )
-        else:
-            formatters = format_cols  # type: ignore
+            data, data_desc = _format_columns(data, data_desc, format_cols)
         # save the table to the file
         data_str: str = data.to_latex(
-            formatters=formatters, escape=False, index=False, **data_desc,
+            escape=False, index=False, **data_desc,
         )  # returns a string since buf is None, see [1]
         if "arraystretch" not in latex_args.keys():
             latex_args["arraystretch"] = LATEX_CONFIG_DIC["arraystretch"]
@@ -389,10 +515,14 @@ class Chapter(object):
         top_caption: bool = latex_args.pop("top_caption", False)  # type: ignore
         data_str = self._rewrite_table(data_str, n, column_type, top_caption)
         latex_args["data"] = data_str
-        self._fill_template(child_filename, TableTemplate(), latex_args)  # type: ignore
+        self._fill_template(child_filename, _TAB_TEMPLATE, latex_args)  # type: ignore
         # get the tex filename for the parent
         parent_filename_tex = list(goal_dir.glob("*.tex"))[0]
-        self.update(parent_filename_tex, child_filename)
+        self.update(
+            parent_filename_tex,
+            child_filename,
+            child_rel=f"{self._child_rel}/{child_filename.name}",
+        )
 
     def _rewrite_table(
         self,
@@ -485,7 +615,12 @@ class Chapter(object):
             data = "\n".join(temp)
         return data
 
-    def update(self, parent: pathlib.Path, child: pathlib.Path) -> None:
+    def update(
+        self,
+        parent: pathlib.Path,
+        child: pathlib.Path,
+        child_rel: Optional[str] = None,
+    ) -> None:
         """Update the result.
 
         If the result is newly created but should still be located
@@ -498,10 +633,14 @@ class Chapter(object):
             The parent file in which the figure is included.
         child : pathlib.Path
             The figure file which is included in the parent.
+        child_rel : Optional[str], optional
+            The path of ``child`` relative to the thesis directory,
+            by default None.
+            If given, it is used as is and ``child`` is not reformatted.
 
         """
-        template: string.Template = InputTemplate()
-        string_: str = template.substitute({"path": child})
+        path = child if child_rel is None else child_rel
+        string_: str = INPUT_TEMPLATE.substitute({"path": path})
         with parent.open(
             mode="r+", encoding=LATEX_CONFIG_DIC["encoding"]
         ) as file:
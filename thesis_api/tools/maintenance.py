@@ -1,20 +1,67 @@
 # -*- coding: utf-8 -*-
 
+import collections
+import concurrent.futures
+import functools
+import logging
+import mmap
+import os
 import pathlib
 import re
-import shutil
 import string
-from typing import Any, Iterable, Union
+from typing import Iterable, Iterator, Union
 
 from .. import LATEX_CONFIG_DIC, get_logger
 from .template_strings import (
-    ChapterTemplate,
-    InputTemplate,
-    SectionTemplate,
-    SubsectionTemplate,
+    CHAPTER_TEMPLATE,
+    INPUT_TEMPLATE,
+    SECTION_TEMPLATE,
+    SUBSECTION_TEMPLATE,
 )
 
-PATTERN = re.compile("(?<=input{).*?(?=})")
+_TEX_EXT: str = LATEX_CONFIG_DIC["tex_file"]
+_ENCODING: str = LATEX_CONFIG_DIC["encoding"]
+# the number of threads which create the subsections of a section
+_MAX_WORKERS: int = 8
+# the keys of the figs, tabs, and code directories in the chapter description
+_FTC_KEYS: tuple[str, ...] = ("figs", "tabs", "code")
+
+PATTERN = re.compile(r"\\input\{([^}]*)\}")
+# the same pattern for scanning the raw bytes of a file
+_BYTES_PATTERN = re.compile(PATTERN.pattern.encode())
+
+
+def _read_inputs(path: pathlib.Path) -> list[str]:
+    """Read the paths of all ``\\input`` statements in a file.
+
+    The file is memory mapped and scanned as bytes, so it is neither read
+    into nor decoded as a whole, only the matches are decoded.
+    If the file cannot be mapped, it is read as bytes instead.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        The file which should be examined.
+
+    Returns
+    -------
+    list[str]
+        The paths within the ``input`` statements.
+
+    """
+    with path.open(mode="rb") as file:
+        try:
+            mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            return []
+        except OSError:
+            # e.g. file systems which do not support memory mapping
+            found: list[bytes] = _BYTES_PATTERN.findall(file.read())
+        else:
+            with mm:
+                found = _BYTES_PATTERN.findall(mm)
+    return [p.decode(_ENCODING) for p in found]
 
 
 class Maintainer(object):
@@ -33,12 +80,18 @@ class Maintainer(object):
         self._thesis_dir: pathlib.Path = thesis_dir
         self._chapter_dir: pathlib.Path = thesis_dir / "chapters"
         self._main_file: pathlib.Path = thesis_dir / "main.tex"
+        # resolve the paths once, since resolve performs syscalls
+        self._thesis_dir_resolved: pathlib.Path = thesis_dir.resolve()
+        self._main_file_resolved: pathlib.Path = self._main_file.resolve()
         self._counter: int = 0
-        # save the template classes
-        self._chapter_template: string.Template = ChapterTemplate()
-        self._sec_template: string.Template = SectionTemplate()
-        self._subsec_template: string.Template = SubsectionTemplate()
-        self._input_template: string.Template = InputTemplate()
+        # cache for the directory listings of cleanup, keyed by the path,
+        # the values are (st_mtime_ns, is_empty, subdirectories)
+        self._dir_cache: dict[str, tuple[int, bool, list[str]]] = {}
+        # save the template classes, the instances are shared module-wide
+        self._chapter_template: string.Template = CHAPTER_TEMPLATE
+        self._sec_template: string.Template = SECTION_TEMPLATE
+        self._subsec_template: string.Template = SUBSECTION_TEMPLATE
+        self._input_template: string.Template = INPUT_TEMPLATE
         # define the logger
         self._stream = stream
         self._logger = get_logger(type(self).__name__, stream=stream)
@@ -56,13 +109,105 @@ class Maintainer(object):
         """
         return self._counter
 
-    def _assert(self, msg: str, left: Any, right: Any, *args):
-        try:
-            assert left == right, msg.format(*args)
-        except AssertionError as e:
+    def _validate_schema(
+        self,
+        chapter: dict[str, Union[bool, int]],
+        sections: list[dict[str, Union[bool, int]]],
+        subsections: dict[str, list[dict[str, Union[bool, int]]]],
+    ) -> None:
+        """Validate the description of a chapter.
+
+        The parameters are the same as in ``init_chapter_dir``.
+
+        Raises
+        ------
+        ValueError
+            If the number of sections or subsections does not match
+            the number of given descriptions.
+
+        """
+        msg: str = ""
+        num_sections = chapter.get("num_sections", 0)
+        if num_sections != (n := len(sections)):
+            msg = f"Number of sections does not match!\nExpected: {num_sections}, Got: {n}!"
+        else:
+            for section in sections:
+                num_subsections = section.get("num_subsections", 10)
+                sec_num = str(section.get("section", 10))
+                if num_subsections != (n := len(subsections.get(sec_num, []))):
+                    msg = f"Number of subsections does not match!\nExpected: {num_subsections}, Got: {n}!"
+                    break
+        if msg:
             if not self._stream:
-                self._logger.critical(msg.format(*args))
-            raise AssertionError from e
+                self._logger.critical(msg)
+            raise ValueError(msg)
+
+    @staticmethod
+    def _exists(path: pathlib.Path, cache: dict[str, bool]) -> bool:
+        """Check if ``path`` exists, using the cache of a single check.
+
+        The cache only lives for one call of ``check_inputs`` or
+        ``check_main``, so files created in between are found.
+
+        Parameters
+        ----------
+        path : pathlib.Path
+            The path which should be checked.
+        cache : dict[str, bool]
+            The existence of the already checked paths, keyed by the path.
+
+        Returns
+        -------
+        bool
+            Whether the path exists.
+
+        """
+        key = str(path)
+        hit = cache.get(key)
+        if hit is None:
+            hit = cache[key] = path.exists()
+        return hit
+
+    def _scandir_tree(
+        self, path: Union[str, pathlib.Path]
+    ) -> Iterator[os.DirEntry]:
+        """Iterate over the entries of ``path`` and all its subdirectories.
+
+        Parameters
+        ----------
+        path : Union[str, pathlib.Path]
+            The directory which should be scanned.
+
+        Yields
+        ------
+        Iterator[os.DirEntry]
+            The entries of ``path`` and all its subdirectories, where
+            a directory is yielded before its content.
+
+        Notes
+        -----
+        Symbolic links to directories are yielded but not followed.
+        The tree is walked breadth-first with an explicit queue instead of
+        recursion, so the depth of the tree does not add stack frames.
+        Errors on ``path`` itself are raised, only subdirectories which
+        disappear during the walk are skipped.
+
+        """
+        queue: collections.deque = collections.deque([path])
+        while queue:
+            current = queue.popleft()
+            try:
+                it = os.scandir(current)
+            except FileNotFoundError:
+                if current is path:
+                    raise
+                self._logger.debug("%s disappeared during the scan!", current)
+                continue
+            with it:
+                for entry in it:
+                    yield entry
+                    if entry.is_dir(follow_symlinks=False):
+                        queue.append(entry.path)
 
     def check_inputs(self, child: pathlib.Path) -> None:
         """Recursivley check ``child`` for ``\\input`` statements.
@@ -71,26 +216,29 @@ class Maintainer(object):
         ----------
         child : pathlib.Path]
             The file which should be checked for input statements.
-        
+
         """
-        for child_ in child.iterdir():
-            if child_.is_dir():
-                if any(child_.iterdir()):
-                    self.check_inputs(child_)
-            else:
-                if LATEX_CONFIG_DIC["tex_file"] in child_.parts[-1]:
-                    for inp in self.find_input(child_):
-                        if not (
-                            p := self._thesis_dir.resolve() / inp
-                        ).exists():
-                            self._counter += 1
-                            self._logger.warning(
-                                f"File {p} is included in {child_.resolve()} but does not exist!\n"
-                            )
-                        else:
-                            self._logger.debug(
-                                f"File {p} is included in {child_.resolve()} and exists!\n"
-                            )
+        debug = self._logger.isEnabledFor(logging.DEBUG)
+        exists_cache: dict[str, bool] = {}
+        for entry in self._scandir_tree(child):
+            if entry.is_file() and entry.name.endswith(_TEX_EXT):
+                child_ = pathlib.Path(entry.path)
+                # only resolved if a message is actually logged
+                child_resolved = None
+                for inp in self.find_input(child_):
+                    p = self._thesis_dir_resolved / inp
+                    if self._exists(p, exists_cache):
+                        if not debug:
+                            continue
+                        level = logging.DEBUG
+                        msg = "File %s is included in %s and exists!\n"
+                    else:
+                        self._counter += 1
+                        level = logging.WARNING
+                        msg = "File %s is included in %s but does not exist!\n"
+                    if child_resolved is None:
+                        child_resolved = child_.resolve()
+                    self._logger.log(level, msg, p, child_resolved)
 
     def check_main(self) -> None:
         """Check the ``main.tex`` file for all input statements.
@@ -101,26 +249,39 @@ class Maintainer(object):
             corresponding files exist.
         2) The chapter tex files in the chapters directory and if
             they are included in the ``main.tex`` file, and if not,
-            then they are written to the corresponding place.
-            
+            then a warning is logged.
+
         """
-        temp = self._main_file.read_text(encoding=LATEX_CONFIG_DIC["encoding"])
-        inputs_re = list(PATTERN.finditer(temp))
-        inputs_p = [pathlib.Path(p.group(0)) for p in inputs_re]
+        # LaTeX appends the file ending if it is omitted in the input statement
+        inputs_p = [
+            p if p.suffix else p.with_suffix(_TEX_EXT)
+            for p in map(pathlib.Path, _read_inputs(self._main_file))
+        ]
+        main_resolved = self._main_file_resolved
+        exists_cache: dict[str, bool] = {}
         for p_in in inputs_p:
-            path = (self._thesis_dir / p_in).resolve()
+            path = self._thesis_dir_resolved / p_in
 
-            if path.exists():
+            if self._exists(path, exists_cache):
                 self._logger.debug(
-                    f"{path} exists and is included in {self._main_file.resolve()}!\n"
+                    "%s exists and is included in %s!\n", path, main_resolved
                 )
             else:
                 self._logger.warning(
-                    f"{path} does not exist but is included in {self._main_file.resolve()}!\n"
+                    "%s does not exist but is included in %s!\n",
+                    path,
+                    main_resolved,
                 )
-            for p_glob in self._chapter_dir.glob("chapter*/*.tex"):
-                if p_glob == p_in:
-                    pass
+        chapter_texs = {
+            p.relative_to(self._thesis_dir)
+            for p in self._chapter_dir.glob("chapter*/*.tex")
+        }
+        for p_orphan in sorted(chapter_texs.difference(inputs_p)):
+            self._logger.warning(
+                "%s is not included in %s!\n",
+                self._thesis_dir_resolved / p_orphan,
+                main_resolved,
+            )
 
     def cleanup(self, child: pathlib.Path, delete: bool = False) -> None:
         """Cleanup empty folders.
@@ -133,24 +294,67 @@ class Maintainer(object):
             Determine if empty folders should be deleted or only printed
             to console for user notification, by default False.
 
+        Notes
+        -----
+        The listing of each directory is cached together with its
+        modification time, which changes whenever an entry is added to or
+        removed from the directory.
+        Repeated cleanups of the same tree therefore only need one ``stat``
+        call for each unchanged directory.
+        Errors on ``child`` itself are raised, only subdirectories which
+        disappear during the walk are skipped.
+        Since the modification time is not always updated, e.g., on file
+        systems with coarse timestamps, a directory is removed with
+        ``os.rmdir``, which fails if it is not empty after all.
+
         """
-        for child_ in child.iterdir():
-            if child_.is_dir():
-                if any(child_.iterdir()):
-                    self.cleanup(child_, delete)
-                else:
-                    self._logger.debug(f"{child_} is empty!")
-                    if delete:
-                        self._logger.debug(
-                            f"{child_} is deleted since {delete=}!\n"
-                        )
-                        shutil.rmtree(child_)
-                    else:
-                        self._logger.debug(
-                            f"{child_} is not deleted since {delete=}!\n"
-                        )
-            else:
+        root = os.fspath(child)
+        empty: list[str] = []
+        queue: collections.deque = collections.deque([root])
+        while queue:
+            current = queue.popleft()
+            try:
+                mtime = os.stat(current, follow_symlinks=False).st_mtime_ns
+                cached = self._dir_cache.get(current)
+                if cached is None or cached[0] != mtime:
+                    with os.scandir(current) as it:
+                        entries = list(it)
+                    subdirs = [
+                        e.path
+                        for e in entries
+                        if e.is_dir(follow_symlinks=False)
+                    ]
+                    cached = (mtime, not entries, subdirs)
+                    self._dir_cache[current] = cached
+            except FileNotFoundError:
+                if current is root:
+                    raise
+                self._logger.debug("%s disappeared during the scan!", current)
                 continue
+            _, is_empty, subdirs = cached
+            if is_empty and current != root:
+                empty.append(current)
+            queue.extend(subdirs)
+        # delete after the walk, so that no deleted directory is scanned
+        for child_ in empty:
+            self._logger.debug("%s is empty!", child_)
+            if delete:
+                # the cached listing may be stale, rmdir never deletes content
+                self._dir_cache.pop(child_, None)
+                try:
+                    os.rmdir(child_)
+                except OSError as e:
+                    self._logger.debug(
+                        "%s is not deleted since it cannot be removed: %s!\n",
+                        child_,
+                        e,
+                    )
+                    continue
+                self._logger.debug("%s is deleted since delete=True!\n", child_)
+            else:
+                self._logger.debug(
+                    "%s is not deleted since delete=False!\n", child_
+                )
 
     def create_ftc(self, path: pathlib.Path, typ: dict) -> None:
         """Create the figs, tabs, and/or code directories.
@@ -162,31 +366,25 @@ class Maintainer(object):
         typ : dict
             A dictionary containing information abouth which
             of the directories should be created at a given level.
+            Keys other than "figs", "tabs", and "code" are ignored.
 
         """
         for k, v in typ.items():
+            if k not in _FTC_KEYS:
+                continue
             temp_path = path / k
             if v:
                 try:
                     temp_path.mkdir(parents=True, exist_ok=False)
                 except FileExistsError:
-                    self._logger.debug(f"Folder {temp_path} already exists.")
+                    self._logger.debug("Folder %s already exists.", temp_path)
             else:
                 self._logger.debug(
-                    f"Folder {temp_path} was not created because it was set to {v}."
+                    "Folder %s was not created because it was set to %s.",
+                    temp_path,
+                    v,
                 )
 
-    def create_subfolder(self, data: dict[str, Any]):
-        typ: str = next(iter(data))
-        num: str = str(data.pop(typ, 10))
-        period: str = typ + num
-        for t in ["num_sections", "num_subsections"]:
-            try:
-                num_s = data.pop(t, 0)
-                break
-            except KeyError:
-                continue
-
     def find_input(self, path: pathlib.Path) -> Iterable[pathlib.Path]:
         """Find all ``\\input`` statements in a given file.
 
@@ -195,15 +393,13 @@ class Maintainer(object):
         path : pathlib.Path
             The file which should be examined.
 
-        Yields
-        ------
+        Returns
+        -------
         Iterable[pathlib.Path]
-            The corresponding path within the ``input`` statement.
+            The corresponding paths within the ``input`` statements.
 
         """
-        temp = path.read_text(encoding=LATEX_CONFIG_DIC["encoding"])
-        for p in PATTERN.finditer(temp):
-            yield pathlib.Path(p.group(0))
+        return map(pathlib.Path, _read_inputs(path))
 
     def init_chapter_dir(
         self,
@@ -252,10 +448,13 @@ class Maintainer(object):
         FileExistsError
             If the ``chapter*.tex`` file already exists, then no file is
             overwritten.
-        AssertionError
+        ValueError
+            If the number of sections or subsections does not match
+            the number of given descriptions.
 
         Notes
         -----
+        The given dictionaries are not modified.
         For convenience, there is a ``chapter.json`` file located in the
         templates folder in this api which can be easily adapted and read
         into a dictionary, see the examples section.
@@ -274,19 +473,12 @@ class Maintainer(object):
         >>> )
 
         """
-        # get the type of folder to create
-        chapter_type = next(iter(chapter))
-        # self.create_subfolder(chapter)
-        # get the chapter number
-        chapter_num = str(chapter.pop("chapter", 10))
+        # validate the whole description before anything is created
+        self._validate_schema(chapter, sections, subsections)
         # define the chapter
-        chapter_ = chapter_type + chapter_num
+        chapter_ = f"chapter{chapter.get('chapter', 10)}"
         # get the number of sections in the chapter
-        num_sections = chapter.pop("num_sections", 0)
-        # test if the number of sections aligns with the number of sections given
-        n: int = len(sections)
-        msg: str = "Number of sections does not match!\nExpected: {}, Got: {}!"
-        self._assert(msg, num_sections, n, num_sections, n)
+        num_sections = chapter.get("num_sections", 0)
         chapter_path = self._chapter_dir / chapter_
         try:
             chapter_path.mkdir(parents=True, exist_ok=False)
@@ -296,70 +488,95 @@ class Maintainer(object):
                     f"{chapter_path} already exists!\nMaybe you want to create a new chapter?\n"
                 )
             raise FileExistsError from e
-        chapter_file = chapter_path / (chapter_ + LATEX_CONFIG_DIC["tex_file"])
+        chapter_file = chapter_path / (chapter_ + _TEX_EXT)
         # create the chapter directories
         self.create_ftc(chapter_path, chapter)
         # open the chapter template
-        chapter_template_str = self._chapter_template.substitute(
-            title=chapter_, label=chapter_
-        )
+        chapter_parts: list[str] = [
+            self._chapter_template.substitute(title=chapter_, label=chapter_)
+        ]
         if num_sections != 0:
+            # the intermediate directories are created together with the leaves
             sec_path = chapter_path / "sections"
-            sec_path.mkdir(parents=True, exist_ok=True)
-            for section in sections:
-                sec_type = next(iter(section))
-                sec_num = str(section.pop("section", 10))
-                sec_ = sec_type + sec_num
-                num_subsections = section.pop("num_subsections", 10)
-                n = len(subsections[sec_num])
-                msg: str = "Number of subsections does not match!\nExpected: {}, Got: {}!"
-                self._assert(msg, num_subsections, n, num_subsections, n)
-                sec_dir = sec_path / sec_
-                sec_dir.mkdir(parents=True, exist_ok=True)
-                sec_file = sec_dir / (sec_ + LATEX_CONFIG_DIC["tex_file"])
-                # open the section template
-                sec_template_str = self._sec_template.substitute(
-                    title=f"{chapter_}-{sec_}", label=f"{chapter_}-{sec_}",
-                )
-                # create the section directories
-                self.create_ftc(sec_dir, section)
-                chapter_template_str += self._input_template.substitute(
-                    {"path": sec_file}
-                )
-                if num_subsections != 0:
-                    subsec_path = sec_dir / "subsections"
-                    subsec_path.mkdir(parents=True, exist_ok=True)
-                    for subsection in subsections[str(sec_num)]:
-                        subsec_type = next(iter(subsection))
-                        subsec_num = str(subsection.pop("subsection", 10))
-                        subsec_ = subsec_type + subsec_num
-                        subsec_dir = subsec_path / subsec_
-                        subsec_dir.mkdir(parents=True, exist_ok=True)
-                        subsec_file = subsec_dir / (
-                            subsec_ + LATEX_CONFIG_DIC["tex_file"]
-                        )
-                        # create the subsection latex file
-                        subsec_template_str = self._subsec_template.substitute(
-                            title=f"{chapter_}-{sec_}-{subsec_}",
-                            label=f"{chapter_}-{sec_}-{subsec_}",
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=_MAX_WORKERS
+            ) as executor:
+                for section in sections:
+                    sec_num = str(section.get("section", 10))
+                    sec_ = f"section{sec_num}"
+                    num_subsections = section.get("num_subsections", 10)
+                    sec_dir = sec_path / sec_
+                    sec_dir.mkdir(parents=True, exist_ok=True)
+                    sec_file = sec_dir / (sec_ + _TEX_EXT)
+                    # open the section template
+                    sec_parts: list[str] = [
+                        self._sec_template.substitute(
+                            title=f"{chapter_}-{sec_}",
+                            label=f"{chapter_}-{sec_}",
                         )
-                        self.tex_file(
-                            subsec_file, subsec_template_str,
+                    ]
+                    # create the section directories
+                    self.create_ftc(sec_dir, section)
+                    chapter_parts.append(
+                        self._input_template.substitute({"path": sec_file})
+                    )
+                    if num_subsections != 0:
+                        subsec_path = sec_dir / "subsections"
+                        prefix = f"{chapter_}-{sec_}"
+                        # the subsections are independent of each other, the
+                        # input statements are returned in the given order
+                        sec_parts.extend(
+                            executor.map(
+                                functools.partial(
+                                    self._make_subsection, subsec_path, prefix
+                                ),
+                                subsections[sec_num],
+                            )
                         )
-                        # create the subsection directories
-                        self.create_ftc(subsec_dir, subsection)
-                        sec_template_str += self._input_template.substitute(
-                            {"path": subsec_file}
+                    else:
+                        self._logger.debug(
+                            "No Subsections created in %s!", sec_dir
                         )
-                else:
-                    self._logger.debug(f"No Subsections created in {sec_dir}!")
-                # create the section latex file
-                self.tex_file(sec_file, sec_template_str)
+                    # create the section latex file
+                    self.tex_file(sec_file, "".join(sec_parts))
 
         else:
-            self._logger.debug(f"No Sections created in {chapter_path}!")
+            self._logger.debug("No Sections created in %s!", chapter_path)
         # create the chapter latex file
-        self.tex_file(chapter_file, chapter_template_str)
+        self.tex_file(chapter_file, "".join(chapter_parts))
+
+    def _make_subsection(
+        self, subsec_path: pathlib.Path, prefix: str, subsection: dict
+    ) -> str:
+        """Create a subsection directory and its LaTeX file.
+
+        Parameters
+        ----------
+        subsec_path : pathlib.Path
+            The ``subsections`` directory of the section.
+        prefix : str
+            The chapter and section part of the title and label.
+        subsection : dict
+            The description of the subsection.
+
+        Returns
+        -------
+        str
+            The input statement of the subsection for the section file.
+
+        """
+        subsec_ = f"subsection{subsection.get('subsection', 10)}"
+        subsec_dir = subsec_path / subsec_
+        subsec_dir.mkdir(parents=True, exist_ok=True)
+        subsec_file = subsec_dir / (subsec_ + _TEX_EXT)
+        # create the subsection latex file
+        subsec_template_str = self._subsec_template.substitute(
+            title=f"{prefix}-{subsec_}", label=f"{prefix}-{subsec_}",
+        )
+        self.tex_file(subsec_file, subsec_template_str)
+        # create the subsection directories
+        self.create_ftc(subsec_dir, subsection)
+        return self._input_template.substitute({"path": subsec_file})
 
     def tex_file(self, path: pathlib.Path, temp: str) -> None:
         """Create the template LaTeX file.
@@ -377,7 +594,10 @@ class Maintainer(object):
         - If the file already exists, then a notification is printed.
 
         """
-        if not path.exists():
-            path.write_text(temp, encoding=LATEX_CONFIG_DIC["encoding"])
-        else:
-            self._logger.debug(f"File {path} already exists.")
+        try:
+            # checking and creating the file is a single atomic call,
+            # the buffered writer writes all bytes or raises
+            with open(path, "xb") as file:
+                file.write(temp.encode(_ENCODING))
+        except FileExistsError:
+            self._logger.debug("File %s already exists.", path)
@@ -3,6 +3,9 @@
 __doc__ = """
 This module implements some LaTeX template strings as Python
 template strings, which makes it easy to use them and write to files.
+The templates are written with ``$``-placeholders, but they are
+converted once into format strings, so filling them does not run a
+regular expression.
 
 Note that the # type: ignore comment should generally not be used,
 although it seems that in this case there is no other solution
@@ -10,9 +13,13 @@ to the linting problem.
 
 """
 
-import string
+import functools
 import pathlib
-from typing import Mapping, Optional
+import re
+import string
+import sys
+import types
+from typing import Callable, Mapping, Optional, Union
 
 __all__ = [
     "ChapterTemplate",
@@ -23,67 +30,351 @@ __all__ = [
     "CodeTemplate",
     "InputTemplate",
     "SiUnitxTemplate",
+    "CHAPTER_TEMPLATE",
+    "SECTION_TEMPLATE",
+    "SUBSECTION_TEMPLATE",
+    "INPUT_TEMPLATE",
 ]
 
-
-def reformat_path(path: pathlib.Path) -> str:
+# the immutable default mapping of substitute and safe_substitute
+_EMPTY: Mapping[str, object] = types.MappingProxyType({})
+
+# the fixed template strings are shared by all instances
+_INPUT_TMPL: str = "\n\\input{$path}\n"
+_CHAPTER_TMPL: str = (
+    "% !TEX root = ../../main.tex\n\n"
+    "\\chapter{$title}\n"
+    "\\label{cha:$label}\n\n"
+    "This is a chapter.\n"
+)
+_SECTION_TMPL: str = (
+    "\\section{$title}\n"
+    "\\label{sec:$label}\n\n"
+    "This is a section within a chapter.\n"
+)
+_SUBSECTION_TMPL: str = (
+    "\\subsection{$title}\n"
+    "\\label{subsec:$label}\n\n"
+    "This is a subsection within a section.\n"
+)
+_FIGURE_TMPL_SHORT: str = (
+    "\\begin{figure}[$position]\n"
+    "\t\\centering\n"
+    "\t\\includegraphics[width=$width\\textwidth]{$path}\n"
+    "\t\\caption[$short_caption]{$long_caption}\n"
+    "\t\\label{fig:$label}\n"
+    "\\end{figure}\n"
+)
+_FIGURE_TMPL_LONG: str = (
+    "\\begin{figure}[$position]\n"
+    "\t\\centering\n"
+    "\t\\includegraphics[width=$width\\textwidth]{$path}\n"
+    "\t\\caption{$caption}\n"
+    "\t\\label{fig:$label}\n"
+    "\\end{figure}\n"
+)
+_TABLE_TMPL: str = (
+    "\\begingroup\n"
+    "\\renewcommand{\\arraystretch}{$arraystretch}\n"
+    "$data\n"
+    "\\endgroup\n"
+)
+_CODE_TMPL_SHORT: str = (
+    "\\begin{listing}[$position]\n"
+    "\t\\inputminted{$language}{$path}\n"
+    "\t\\caption[$short_caption]{$long_caption}\n"
+    "\t\\label{lst:$label}\n"
+    "\\end{listing}\n"
+)
+_CODE_TMPL_LONG: str = (
+    "\\begin{listing}[$position]\n"
+    "\t\\inputminted{$language}{$path}\n"
+    "\t\\caption{$caption}\n"
+    "\t\\label{lst:$label}\n"
+    "\\end{listing}\n"
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def reformat_path(path: Union[str, pathlib.PurePath]) -> str:
     """Reformat the path structure.
 
     The ``path`` structure is replaced by the actual path,
     but the path starts at ``source`` and the windows backslashes \\
     are replaced by slashes /.
+    The results are cached, since the same paths are reformatted
+    repeatedly.
 
     Parameters
     ----------
-    path : pathlib.Path
-        The path which should be formatted.
+    path : Union[str, pathlib.PurePath]
+        The path which should be formatted, a string is treated like the
+        posix representation of a path.
 
     Returns
     -------
     str
         A string representation of the reformatted path.
 
+    Notes
+    -----
+    Path objects cannot be weakly referenced, so the cache keeps the
+    paths alive; its size is bounded to limit the memory usage.
+
     """
-    for i, part in enumerate(path.parts):
-        if part == "source":
-            child: str = "/".join(path.parts[i:])
-            break
-        else:
-            child: str = f"{path}"
+    if isinstance(path, pathlib.PurePath):
+        child: str = path.as_posix()
+    else:
+        child = path.replace("\\", "/")
+    # the separators around the path also match a leading or trailing source
+    i = f"/{child}/".find("/source/")
+    if i >= 0:
+        child = child[i:]
     return child
 
 
-class SiUnitxTemplate(string.Template):
-    def __init__(self, unit: Optional[str], kwds: dict = {}) -> None:
+@functools.lru_cache(maxsize=256)
+def _to_format(
+    template: str, pattern: re.Pattern = string.Template.pattern
+) -> Optional[str]:
+    """Convert a ``string.Template`` string into a ``str.format`` string.
+
+    The placeholders ``$name`` and ``${name}`` become ``{name!s}``, ``$$``
+    becomes ``$`` and the braces of the LaTeX code are escaped.
+    The conversion is cached, so the fixed templates are converted only
+    once and all their instances share the same format string.
+    The cache is bounded, since the siunitx templates depend on the
+    arguments of the user.
+
+    Parameters
+    ----------
+    template : str
+        The template string with ``$``-placeholders.
+    pattern : re.Pattern, optional
+        The compiled placeholder pattern of the template class,
+        by default ``string.Template.pattern``.
+
+    Returns
+    -------
+    Optional[str]
+        The equivalent format string or None, if the template contains
+        an invalid placeholder.
+
+    """
+    parts: list[str] = []
+    pos = 0
+    for mo in pattern.finditer(template):
+        parts.append(
+            template[pos : mo.start()].replace("{", "{{").replace("}", "}}")
+        )
+        named = mo.group("named") or mo.group("braced")
+        if named is not None:
+            # string.Template inserts str(value), not format(value, "")
+            parts.append("{" + named + "!s}")
+        elif mo.group("escaped") is not None:
+            parts.append("$")
+        else:
+            # string.Template reports invalid placeholders when substituting
+            return None
+        pos = mo.end()
+    parts.append(template[pos:].replace("{", "{{").replace("}", "}}"))
+    return "".join(parts)
+
+
+def _merge(
+    mapping: Mapping[str, object], kwds: dict[str, object]
+) -> Mapping[str, object]:
+    """Merge the mapping and the keyword arguments of a substitution.
+
+    A new dict is only built if both are given, ``kwds`` is the fresh
+    dict of the keyword arguments of the call and can be returned.
+
+    Parameters
+    ----------
+    mapping : Mapping[str, object]
+        The values of the placeholders.
+    kwds : dict[str, object]
+        Additional values, which take precedence over ``mapping``.
+
+    Returns
+    -------
+    Mapping[str, object]
+        The merged values.
+
+    """
+    if not kwds:
+        return mapping
+    if not mapping:
+        return kwds
+    return {**mapping, **kwds}
+
+
+def _prepare_mapping(
+    mapping: Mapping[str, object],
+    kwds: dict[str, object],
+    path: bool = False,
+    short_caption: bool = False,
+) -> Mapping[str, object]:
+    """Prepare the values of a template with a path and a caption.
+
+    If ``path`` is set, a ``pathlib.PurePath`` in ``path`` is reformatted
+    with ``reformat_path``, a string is used as is apart from replacing
+    windows backslashes by slashes.
+    If ``short_caption`` is set, the ``caption`` tuple is split into
+    ``long_caption`` and ``short_caption``.
+    The given mapping is not modified, it is only copied if a value
+    has to be changed.
+
+    Parameters
+    ----------
+    mapping : Mapping[str, object]
+        The values of the placeholders.
+    kwds : dict[str, object]
+        Additional values, which take precedence over ``mapping``.
+    path : bool, optional
+        Determine if the path is reformatted, by default False.
+    short_caption : bool, optional
+        Determine if the caption is split, by default False.
+
+    Returns
+    -------
+    Mapping[str, object]
+        The values which can be passed to the template.
+
+    """
+    new_path: Optional[str] = None
+    if path:
+        path_ = kwds["path"] if "path" in kwds else mapping.get("path")
+        if isinstance(path_, pathlib.PurePath):
+            new_path = reformat_path(path_)
+        elif isinstance(path_, str) and "\\" in path_:
+            # a string is already formatted, only the separators are replaced
+            new_path = path_.replace("\\", "/")
+    if new_path is None and not short_caption:
+        return _merge(mapping, kwds)
+    # the values are changed, so the caller's mapping is never returned
+    values = kwds if kwds and not mapping else {**mapping, **kwds}
+    if new_path is not None:
+        values["path"] = new_path
+    if short_caption:
+        caption = values["caption"]
+        values["long_caption"], values["short_caption"] = caption  # type: ignore
+    return values
+
+
+class _FormatTemplate(string.Template):
+    """Base class.
+
+    This is a base class for LaTeX templates which are filled with
+    ``str.format_map`` instead of the regex based substitution of
+    ``string.Template``, so a substitution is a single C level call.
+    The template is converted only once when the class is initialized.
+    Templates with invalid placeholders and ``safe_substitute`` use the
+    implementation of ``string.Template``, so the results are the same.
+
+    """
+
+    # string.Template has no slots, so only the own attributes are slotted
+    __slots__ = ("_fmt", "_render")
+
+    def __init__(self, template: str) -> None:
+        """Init the class.
+
+        Parameters
+        ----------
+        template : str
+            The template to use.
+
+        """
+        # string.Template.__init__ only stores the template
+        self.template = template
+        # the pattern is compiled once per class, when the class is created
+        self._fmt: Optional[str] = _to_format(template, self.pattern)
+        # the bound method renders the template without attribute lookups
+        self._render: Callable[[Mapping[str, object]], str] = (
+            super().substitute if self._fmt is None else self._fmt.format_map
+        )
+
+    def substitute(
+        self, mapping: Mapping[str, object] = _EMPTY, /, **kwds: object
+    ) -> str:
+        """Overwrite the substitute method.
+
+        Returns
+        -------
+        str
+            The template with replaced values.
+
+        """
+        return self._render(self._prepare(mapping, kwds))
+
+    def safe_substitute(
+        self, mapping: Mapping[str, object] = _EMPTY, /, **kwds: object
+    ) -> str:
+        """Overwrite the ``safe_substitute`` method.
+
+        Placeholders without a value and invalid placeholders are kept
+        in the template, like in ``string.Template``.
+
+        Returns
+        -------
+        str
+            The template with replaced values.
+
+        """
+        return super().safe_substitute(self._prepare(mapping, kwds))
+
+    def _prepare(
+        self, mapping: Mapping[str, object], kwds: dict[str, object]
+    ) -> Mapping[str, object]:
+        """Prepare the values for ``substitute`` and ``safe_substitute``.
+
+        Parameters
+        ----------
+        mapping : Mapping[str, object]
+            The values of the placeholders.
+        kwds : dict[str, object]
+            Additional values, which take precedence over ``mapping``.
+
+        Returns
+        -------
+        Mapping[str, object]
+            The values which are filled into the template.
+
+        """
+        return _merge(mapping, kwds)
+
+
+class SiUnitxTemplate(_FormatTemplate):
+    def __init__(
+        self, unit: Optional[str], kwds: Optional[Mapping[str, object]] = None
+    ) -> None:
         """Generate a siunitx macro.
 
         Parameters
         ----------
         unit : Optional[str]
             The unit of the quantitity.
-        kwds : dict, optional
+        kwds : Optional[Mapping[str, object]], optional
             Additional keyword arguments the macros of the siunitx package
-            take, by default {}.
+            take, by default None.
         
         """
         if kwds:
-            opt_args = "\n"
-            for k, v in kwds.items():
-                opt_args += f"{k}={v},"
+            opt_args = "\n" + "".join(f"{k}={v}," for k, v in kwds.items())
             if unit:
-                template: str = "\\qty[" + opt_args + "]{$num}{$unit}"
-
+                template = f"\\qty[{opt_args}]{{$num}}{{$unit}}"
             else:
-                template: str = "\\num[" + opt_args + "]{$num}"
+                template = f"\\num[{opt_args}]{{$num}}"
+        elif unit:
+            template = "\\qty{$num}{$unit}"
         else:
-            if unit:
-                template: str = "\\qty{$num}{$unit}"
-            else:
-                template: str = "\\num{$num}"
-        super().__init__(template)
+            template = "\\num{$num}"
+        # equal macros of different columns share one string
+        super().__init__(sys.intern(template))
 
 
-class InputTemplate(string.Template):
+class InputTemplate(_FormatTemplate):
     """A template class for ``input`` statements.
 
     This template class provides an interface to LaTeX by
@@ -93,31 +384,29 @@ class InputTemplate(string.Template):
     """
 
     def __init__(self) -> None:
-        template: str = "\n\\input{$path}\n"
-        super().__init__(template)
+        super().__init__(_INPUT_TMPL)
 
-    def substitute(
-        self, __mapping: Mapping[str, object], **kwds: object
-    ) -> str:
-        """Substitute the placeholder.
+    def _prepare(
+        self, mapping: Mapping[str, object], kwds: dict[str, object]
+    ) -> Mapping[str, object]:
+        """Prepare the ``path`` placeholder.
 
         The ``path`` placeholder is replaced by the actual path,
-        but the path starts at ``chapters`` and the windows backslashes \\
-        are replaced by slashes /.
+        but the path starts at ``source`` and the windows backslashes \\
+        are replaced by slashes /, see ``reformat_path``.
+        If the path is already given as string, only the backslashes are
+        replaced.
 
         Returns
         -------
-        str
-            The substituted template string.
+        Mapping[str, object]
+            The values which are filled into the template.
 
         """
-        path = _InputTemplate__mapping["path"]  # type: ignore
-        child = reformat_path(path)
-        _InputTemplate__mapping["path"] = child  # type: ignore
-        return super().substitute(_InputTemplate__mapping, **kwds)  # type: ignore
+        return _prepare_mapping(mapping, kwds, path=True)
 
 
-class ChapterTemplate(string.Template):
+class ChapterTemplate(_FormatTemplate):
     """A template class for chapters.
 
     This template class provides an interface to LaTeX by
@@ -126,16 +415,10 @@ class ChapterTemplate(string.Template):
     """
 
     def __init__(self) -> None:
-        template: str = (
-            "% !TEX root = ../../main.tex\n\n"
-            "\\chapter{$title}\n"
-            "\\label{cha:$label}\n\n"
-            "This is a chapter.\n"
-        )
-        super().__init__(template)
+        super().__init__(_CHAPTER_TMPL)
 
 
-class SectionTemplate(string.Template):
+class SectionTemplate(_FormatTemplate):
     """A template class for sections.
 
     This template class provides an interface to LaTeX by
@@ -144,15 +427,10 @@ class SectionTemplate(string.Template):
     """
 
     def __init__(self) -> None:
-        template: str = (
-            "\\section{$title}\n"
-            "\\label{sec:$label}\n\n"
-            "This is a section within a chapter.\n"
-        )
-        super().__init__(template)
+        super().__init__(_SECTION_TMPL)
 
 
-class SubsectionTemplate(string.Template):
+class SubsectionTemplate(_FormatTemplate):
     """A template class for subsections.
 
     This template class provides an interface to LaTeX by
@@ -161,15 +439,10 @@ class SubsectionTemplate(string.Template):
     """
 
     def __init__(self) -> None:
-        template: str = (
-            "\\subsection{$title}\n"
-            "\\label{subsec:$label}\n\n"
-            "This is a subsection within a section.\n"
-        )
-        super().__init__(template)
+        super().__init__(_SUBSECTION_TMPL)
 
 
-class _CaptionTemplate(string.Template):
+class _CaptionTemplate(_FormatTemplate):
     """Base class.
 
     This is a base class for LaTeX templates which can provide a short
@@ -177,6 +450,8 @@ class _CaptionTemplate(string.Template):
     
     """
 
+    __slots__ = ("_short_caption",)
+
     def __init__(self, template: str, short_caption: bool = False) -> None:
         """Init the class.
 
@@ -192,47 +467,25 @@ class _CaptionTemplate(string.Template):
         self._short_caption = short_caption
         super().__init__(template)
 
-    def substitute(
-        self, __mapping: Mapping[str, object], **kwds: object
-    ) -> str:
-        """Overwrite the substitute method.
+    def _prepare(
+        self, mapping: Mapping[str, object], kwds: dict[str, object]
+    ) -> Mapping[str, object]:
+        """Prepare the caption.
 
         Depending on the value of ``self._short_caption``, the template is
         filled differently.
+        The path is inserted unchanged, unlike in ``InputTemplate``.
+        The given mapping is not modified.
 
         Returns
         -------
-        str
-            The template with replaced values.
+        Mapping[str, object]
+            The values which are filled into the template.
 
         """
-        if self._short_caption:
-            long_caption, short_caption = _CaptionTemplate__mapping["caption"]  # type: ignore
-            _CaptionTemplate__mapping["short_caption"] = short_caption  # type: ignore
-            _CaptionTemplate__mapping["long_caption"] = long_caption  # type: ignore
-            _CaptionTemplate__mapping.pop("caption")  # type: ignore
-        return super().substitute(_CaptionTemplate__mapping, **kwds)  # type: ignore
-
-    def safe_substitute(
-        self, __mapping: Mapping[str, object], **kwds: object
-    ) -> str:
-        """Overwrite the ``safe_substitute`` method.
-
-        Depending on the value of ``self._short_caption``, the template is
-        filled differently.
-
-        Returns
-        -------
-        str
-            The template with replaced values.
-
-        """
-        if self._short_caption:
-            long_caption, short_caption = _CaptionTemplate__mapping["caption"]  # type: ignore
-            _CaptionTemplate__mapping["short_caption"] = short_caption  # type: ignore
-            _CaptionTemplate__mapping["long_caption"] = long_caption  # type: ignore
-            _CaptionTemplate__mapping.pop("caption")  # type: ignore
-        return super().safe_substitute(_CaptionTemplate__mapping, **kwds)  # type: ignore
+        return _prepare_mapping(
+            mapping, kwds, short_caption=self._short_caption
+        )
 
 
 class FigureTemplate(_CaptionTemplate):
@@ -253,29 +506,11 @@ class FigureTemplate(_CaptionTemplate):
             by default False.
 
         """
-
-        if short_caption:
-            template: str = (
-                "\\begin{figure}[$position]\n"
-                "\t\\centering\n"
-                "\t\\includegraphics[width=$width\\textwidth]{$path}\n"
-                "\t\\caption[$short_caption]{$long_caption}\n"
-                "\t\\label{fig:$label}\n"
-                "\\end{figure}\n"
-            )
-        else:
-            template: str = (
-                "\\begin{figure}[$position]\n"
-                "\t\\centering\n"
-                "\t\\includegraphics[width=$width\\textwidth]{$path}\n"
-                "\t\\caption{$caption}\n"
-                "\t\\label{fig:$label}\n"
-                "\\end{figure}\n"
-            )
+        template = _FIGURE_TMPL_SHORT if short_caption else _FIGURE_TMPL_LONG
         super().__init__(template, short_caption)
 
 
-class TableTemplate(string.Template):
+class TableTemplate(_FormatTemplate):
     """A template class for tables.
 
     This template class provides an interface to LaTeX by
@@ -292,13 +527,7 @@ class TableTemplate(string.Template):
     """
 
     def __init__(self) -> None:
-        template: str = (
-            "\\begingroup\n"
-            "\\renewcommand{\\arraystretch}{$arraystretch}\n"
-            "$data\n"
-            "\\endgroup\n"
-        )
-        super().__init__(template)
+        super().__init__(_TABLE_TMPL)
 
 
 class CodeTemplate(_CaptionTemplate):
@@ -319,21 +548,12 @@ class CodeTemplate(_CaptionTemplate):
             by default False.
 
         """
-        if short_caption:
-            template: str = (
-                "\\begin{listing}[$position]\n"
-                "\t\\inputminted{$language}{$path}\n"
-                "\t\\caption[$short_caption]{$long_caption}\n"
-                "\t\\label{lst:$label}\n"
-                "\\end{listing}\n"
-            )
-        else:
-            template: str = (
-                "\\begin{listing}[$position]\n"
-                "\t\\inputminted{$language}{$path}\n"
-                "\t\\caption{$caption}\n"
-                "\t\\label{lst:$label}\n"
-                "\\end{listing}\n"
-            )
+        template = _CODE_TMPL_SHORT if short_caption else _CODE_TMPL_LONG
         super().__init__(template, short_caption)
 
+
+# the templates are stateless, so the instances can be shared
+CHAPTER_TEMPLATE = ChapterTemplate()
+SECTION_TEMPLATE = SectionTemplate()
+SUBSECTION_TEMPLATE = SubsectionTemplate()
+INPUT_TEMPLATE = InputTemplate()